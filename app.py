@@ -7,142 +7,370 @@ import sqlite3
 import json
 import re
 import os
-from flask import Flask, request, jsonify, send_from_directory
+import math
+import random
+import threading
+from collections import Counter
+from flask import Flask, Response, request, send_from_directory
 from flask_cors import CORS
 from functools import lru_cache
-from contextlib import contextmanager
 
 try:
-    from rapidfuzz import fuzz, process
+    from rapidfuzz import fuzz, process, utils
     RAPIDFUZZ_AVAILABLE = True
 except ImportError:
     RAPIDFUZZ_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
 app = Flask(__name__, static_folder='.')
 CORS(app)
 
+# Number of FTS candidates reranked by rapidfuzz for fuzzy search
+FUZZY_CANDIDATES = 500
+# Minimum rapidfuzz ratio for a dictionary term to count as a typo variant
+FUZZY_TERM_CUTOFF = 80
+
+# Matching chunks sampled per term to find its spelling for /api/suggest
+SUGGEST_SAMPLE = 20
+
+# SQLite page cache budget per process (KiB), split across the per-thread
+# connections; gunicorn sets DB_THREADS to its thread count after forking
+PAGE_CACHE_KIB = 200000
+DB_THREADS = 1
+
+# Upper bound on rowids probed per /api/random draw, and draws per request
+RANDOM_MAX_CANDIDATES = 1000
+RANDOM_DRAWS = 3
+
 # Database path - configurable via environment variable for deployment
 DB_PATH = os.environ.get('DATABASE_PATH', './data/corpus.sqlite')
 
-# Connection pool
-@contextmanager
-def get_db():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+# Match years 1980-2029; RE2's DFA keeps the corpus-wide year scan linear
+_YEAR_RE = (re2 if RE2_AVAILABLE else re).compile(r'\b(19[89]\d|20[0-2]\d)\b')
+_WORD_RE = re.compile(r'\w+')
+_WS_RE = re.compile(r'\s+')
+_BOILERPLATE_RE = re.compile(r'please note.*?privileged.*?$', re.IGNORECASE | re.DOTALL)
+_EFTA_RE = re.compile(r'EFTA.*?\d+')
+_SNIPPET_MATCH_RE = re.compile('\x01(.*?)\x02')  # Tokens marked by snippet()
+
+# Indexes for the hot chunk lookups, created by _ensure_schema()
+_INDEXES = [
+    ('idx_chunks_doc_textlen', 'chunks(doc_id, LENGTH(text))'),  # Unique combined search
+    ('idx_chunks_doc_order', 'chunks(doc_id, order_index)'),  # /api/document
+    ('idx_chunks_cluster_prob', 'chunks(cluster_id, cluster_prob DESC)'),  # /api/cluster
+]
+
+# One long-lived connection per thread, so each keeps its prepared
+# statements cached across requests
+_TLS = threading.local()
+
+# Schema checks run for the first connection only, not every thread's
+_SCHEMA_LOCK = threading.Lock()
+_schema_checked = False
+
+def set_db_threads(threads):
+    """Split the page cache across this many per-thread connections."""
+    global DB_THREADS
+    DB_THREADS = max(1, int(threads))
+
+def _open_db():
+    conn = sqlite3.connect(DB_PATH, isolation_level=None, cached_statements=256)
     conn.row_factory = sqlite3.Row
     try:
-        yield conn
-    finally:
-        conn.close()
-
-def highlight_text(text, query):
-    """Highlight matching terms in text."""
-    if not query:
-        return text
-    words = query.split()
-    for word in words:
-        # Case-insensitive highlight that preserves original case
-        pattern = re.compile(f'({re.escape(word)})', re.IGNORECASE)
-        text = pattern.sub(r'<mark>\1</mark>', text)
-    return text
-
-def generate_typo_variants(word):
-    """
-    Generate common typo variations of a word.
-    Handles: missing letters, doubled letters, swapped letters, common substitutions.
-    """
-    variants = [word.lower()]
-    word = word.lower()
-
-    # Common letter substitutions (phonetic)
-    substitutions = {
-        'ph': 'f', 'f': 'ph',
-        'gh': 'g', 'g': 'gh',
-        'c': 'k', 'k': 'c',
-        'c': 's', 's': 'c',
-        'z': 's', 's': 'z',
-        'x': 'ks', 'ks': 'x',
-        'qu': 'kw', 'kw': 'qu',
-        'tion': 'shun', 'shun': 'tion',
-        'i': 'y', 'y': 'i',
-        'ee': 'i', 'i': 'ee',
-        'ei': 'ie', 'ie': 'ei',
-        'ai': 'ay', 'ay': 'ai',
-        'ou': 'ow', 'ow': 'ou',
-    }
+        conn.execute("PRAGMA journal_mode=WAL")
+    except sqlite3.OperationalError:
+        pass  # Read-only database file
+    conn.execute("PRAGMA mmap_size=1073741824")
+    conn.execute(f"PRAGMA cache_size=-{PAGE_CACHE_KIB // DB_THREADS}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.create_function('extract_years', 1, _extract_years, deterministic=True)
+    # Term dictionary of the FTS index, used for autocomplete
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS temp.chunks_vocab
+        USING fts5vocab(main, chunks_fts, 'row')
+    """)
+    _ensure_schema(conn)
+    return conn
+
+def _table_exists(conn, name, kind='table'):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = ? AND name = ?", (kind, name)
+    ).fetchone()
+    return row is not None
+
+def _ensure_schema(conn):
+    """
+    One-shot migration for derived tables and indexes the API reads from.
+    Skipped when the database is read-only; endpoints fall back to scanning.
+    Runs once per process; forked workers inherit the result.
+    """
+    global _schema_checked
+    with _SCHEMA_LOCK:
+        if not _schema_checked:
+            _migrate_schema(conn)
+            _schema_checked = True
 
-    # Generate variants with single character missing
-    for i in range(len(word)):
-        variant = word[:i] + word[i+1:]
-        if len(variant) >= 3:
-            variants.append(variant)
+def _migrate_schema(conn):
+    try:
+        build_years = not _table_exists(conn, 'chunk_years')
+        if build_years:
+            _build_chunk_years(conn)
+        missing = [(name, columns) for name, columns in _INDEXES
+                   if not _table_exists(conn, name, kind='index')]
+        for name, columns in missing:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {columns}")
+        if missing:
+            # Refresh planner statistics so the new indexes get picked
+            conn.execute("ANALYZE")
+        if build_years or missing:
+            # Flush the WAL into the database file now, so its mtime (the
+            # cache version) settles before any results are cached
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    except sqlite3.OperationalError:
+        pass
+
+def _extract_years(text):
+    """SQL function extract_years(text): JSON array of the years mentioned in text."""
+    return json.dumps([int(year) for year in _YEAR_RE.findall(text or '')])
+
+# One (chunk_uid, year) row per year mention, expanded inside SQLite
+_CHUNK_YEARS_SELECT = """
+    SELECT c.uid AS chunk_uid, y.value AS year
+    FROM chunks c, json_each(extract_years(c.text)) y
+    WHERE c.text IS NOT NULL
+"""
 
-    # Generate variants with adjacent letters swapped
-    for i in range(len(word) - 1):
-        variant = word[:i] + word[i+1] + word[i] + word[i+2:]
-        variants.append(variant)
+def _build_chunk_years(conn):
+    """Materialize one (chunk_uid, year) row per year mentioned in each chunk."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("""
+            CREATE TABLE chunk_years (chunk_uid TEXT NOT NULL, year INTEGER NOT NULL)
+        """)
+        conn.execute(f"""
+            INSERT INTO chunk_years (chunk_uid, year)
+            {_CHUNK_YEARS_SELECT}
+        """)
+        conn.execute("CREATE INDEX idx_chunk_years_year ON chunk_years(year)")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
 
-    # Apply common substitutions
-    for old, new in substitutions.items():
-        if old in word:
-            variants.append(word.replace(old, new, 1))
+def get_db():
+    conn = getattr(_TLS, 'conn', None)
+    # Reopen after a fork (e.g. gunicorn --preload); connections must not
+    # be shared across processes.
+    if conn is None or _TLS.pid != os.getpid():
+        conn = _TLS.conn = _open_db()
+        _TLS.pid = os.getpid()
+    return conn
+
+def dumps_json(payload):
+    """Serialize payload to JSON, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload)
+
+def json_response(payload):
+    """JSON response for an API payload; stands in for jsonify."""
+    return Response(dumps_json(payload), mimetype='application/json')
+
+def fts_phrase(text):
+    """Quote text as an FTS5 phrase query, e.g. Bill Gates -> "Bill Gates"."""
+    return '"' + text.replace('"', '""') + '"'
+
+def _db_version():
+    """Modification time of the database file, used to invalidate cached results."""
+    try:
+        return os.path.getmtime(DB_PATH)
+    except OSError:
+        return 0
 
-    return list(set(variants))[:10]  # Limit to prevent explosion
+@lru_cache(maxsize=256)
+def highlight_pattern(words):
+    """Compile a single case-insensitive alternation matching any of the words."""
+    # Longest first so overlapping words prefer the fuller match
+    alternation = '|'.join(re.escape(word) for word in sorted(set(words), key=len, reverse=True))
+    return re.compile(f'({alternation})', re.IGNORECASE)
 
-def build_fuzzy_pattern(query):
+def highlight_text(text, query):
     """
-    Build SQL LIKE patterns for fuzzy matching.
-    More targeted than character-by-character matching.
+    Highlight matching terms in text in a single pass.
+    query is either a search string or a pattern from highlight_pattern().
     """
-    patterns = []
-    words = query.lower().split()
-
-    for word in words:
-        if len(word) < 3:
-            patterns.append(f'%{word}%')
-            continue
-
-        # Main pattern: allow one character variation anywhere
-        # E.g., "maxwell" -> "%m_xwell%" or "%ma_well%" etc.
-        for i in range(len(word)):
-            pattern = '%' + word[:i] + '_' + word[i+1:] + '%'
-            patterns.append(pattern)
+    if not query:
+        return text
+    if isinstance(query, str):
+        words = tuple(query.split())
+        if not words:
+            return text
+        query = highlight_pattern(words)
+    # Case-insensitive highlight that preserves original case
+    return query.sub(r'<mark>\1</mark>', text)
+
+def _make_result_row(row, highlight):
+    """
+    Build a search result from a plain tuple row of
+    (uid, doc_id, source_file, text, cluster_id, token_count, ...),
+    slicing the preview text once. Trailing columns are ignored.
+    """
+    uid, doc_id, source_file, text, cluster_id, token_count = row[:6]
+    text = text or ''
+    preview = text[:500]
+    ellipsis = '...' if len(text) > 500 else ''
+    return {
+        'uid': uid,
+        'doc_id': doc_id,
+        'source_file': source_file,
+        'text': preview + ellipsis,
+        'text_highlighted': highlight_text(preview, highlight) + ellipsis,
+        'cluster_id': cluster_id,
+        'token_count': token_count
+    }
 
-        # Also include exact match
-        patterns.append(f'%{word}%')
+def _page_results(cursor, highlight, offset=0, count_sql=None, count_params=()):
+    """
+    Build result rows straight from the cursor. Returns (results, total),
+    with total read from the trailing total_count column of each row.
+    A page past the last match has no row to carry the count, so count_sql
+    (the same WHERE as the page) is run instead.
+    """
+    results = []
+    total = 0
+    for row in cursor:
+        total = row[-1]
+        results.append(_make_result_row(row, highlight))
+    if not results and offset > 0 and count_sql:
+        cursor.execute(count_sql, count_params)
+        total = cursor.fetchone()[0]
+    return results, total
 
-        # Generate typo variants
-        for variant in generate_typo_variants(word):
-            patterns.append(f'%{variant}%')
+@lru_cache(maxsize=4096)
+def surface_forms(term, db_version):
+    """
+    Lowercased spellings of an indexed term in the corpus text, most common
+    first, read from short FTS snippets of a sample of matching chunks.
+    The term is matched as a prefix: a quoted stem would be stemmed again
+    and can miss its own rows (univers -> univer).
+    """
+    cursor = get_db().execute("""
+        SELECT snippet(chunks_fts, -1, char(1), char(2), '', 16) AS fragment
+        FROM chunks_fts WHERE chunks_fts MATCH ?
+        LIMIT ?
+    """, (fts_phrase(term) + '*', SUGGEST_SAMPLE))
+    counts = Counter(
+        word.lower()
+        for row in cursor.fetchall()
+        for word in _SNIPPET_MATCH_RE.findall(row['fragment'] or '')
+    )
+    # Most common first, shorter spelling on ties
+    return tuple(sorted(counts, key=lambda word: (-counts[word], len(word))))
+
+def _stem_ratio(word, term, **kwargs):
+    """
+    rapidfuzz ratio of a dictionary stem against word, also trying the prefix
+    of word the stem would cover: porter drops suffixes, so 'univers' should
+    match 'univercity' on 'univerc' rather than the whole word.
+    """
+    score = fuzz.ratio(word, term, **kwargs)
+    if len(term) < len(word):
+        score = max(score, fuzz.ratio(word[:len(term)], term, **kwargs))
+    return score
 
-    return list(set(patterns))
+@lru_cache(maxsize=4096)
+def typo_terms(word, db_version, limit=5):
+    """
+    Indexed terms a typo or two away from word, found by rapidfuzz over the
+    slice of the FTS dictionary sharing its first letter and similar length
+    (terms are stems, so up to a few letters shorter). Scanning the slice is the slow part, so cache per database version.
+    """
+    if not RAPIDFUZZ_AVAILABLE or len(word) < 4:
+        return ()
+    cursor = get_db().execute("""
+        SELECT term FROM chunks_vocab
+        WHERE term >= ? AND term < ? AND LENGTH(term) BETWEEN ? AND ?
+    """, (word[0], chr(ord(word[0]) + 1), max(4, len(word) - 4), len(word) + 2))
+    matches = process.extract(
+        word,
+        [row[0] for row in cursor],
+        scorer=_stem_ratio,
+        score_cutoff=FUZZY_TERM_CUTOFF,
+        limit=limit
+    )
+    return tuple(term for term, _, _ in matches)
+
+def fuzzy_fts_query(query):
+    """
+    Build an FTS5 query for fuzzy candidate lookup: each word as a prefix,
+    OR'd with the indexed terms typo_terms() finds for it. Those terms are
+    stems, so they are matched as prefixes too: quoted as-is they would be
+    stemmed again and can miss their own rows (univers -> univer).
+    """
+    version = _db_version()
+    alternatives = []
+    for word in _WORD_RE.findall(query.lower()):
+        alternatives.append(fts_phrase(word) + '*')
+        alternatives.extend(fts_phrase(term) + '*'
+                            for term in typo_terms(word, version))
+    return ' OR '.join(dict.fromkeys(alternatives))
+
+def rerank_fuzzy(query, rows):
+    """Order FTS candidates by rapidfuzz similarity to the query, best first."""
+    if not RAPIDFUZZ_AVAILABLE or not rows:
+        return list(rows)
+    matches = process.extract(
+        query,
+        [row[3] or '' for row in rows],  # text column of a result row
+        scorer=fuzz.partial_ratio,
+        processor=utils.default_process,
+        limit=None
+    )
+    return [rows[index] for _, _, index in matches]
 
 @app.route('/')
 def index():
     return send_from_directory('.', 'dashboard.html')
 
-@app.route('/api/stats')
-def get_stats():
-    """Get corpus statistics for dashboard header."""
-    with get_db() as conn:
-        cursor = conn.cursor()
+@lru_cache(maxsize=1)
+def _compute_stats(db_version):
+    """Corpus-wide counts; the database is read-only at runtime so cache per version."""
+    conn = get_db()
+    cursor = conn.cursor()
+
+    stats = {}
 
-        stats = {}
+    # Total counts
+    cursor.execute("SELECT COUNT(*) FROM docs")
+    stats['total_docs'] = cursor.fetchone()[0]
 
-        # Total counts
-        cursor.execute("SELECT COUNT(*) FROM docs")
-        stats['total_docs'] = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM chunks")
+    stats['total_chunks'] = cursor.fetchone()[0]
 
-        cursor.execute("SELECT COUNT(*) FROM chunks")
-        stats['total_chunks'] = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(DISTINCT cluster_id) FROM chunks WHERE cluster_id IS NOT NULL")
+    stats['total_clusters'] = cursor.fetchone()[0]
 
-        cursor.execute("SELECT COUNT(DISTINCT cluster_id) FROM chunks WHERE cluster_id IS NOT NULL")
-        stats['total_clusters'] = cursor.fetchone()[0]
+    # Get metadata
+    cursor.execute("SELECT k, v FROM meta")
+    stats['meta'] = {row['k']: row['v'] for row in cursor.fetchall()}
 
-        # Get metadata
-        cursor.execute("SELECT k, v FROM meta")
-        stats['meta'] = {row['k']: row['v'] for row in cursor.fetchall()}
+    return stats
 
-        return jsonify(stats)
+@app.route('/api/stats')
+def get_stats():
+    """Get corpus statistics for dashboard header."""
+    return json_response(_compute_stats(_db_version()))
 
 @app.route('/api/search')
 def search():
@@ -157,132 +385,121 @@ def search():
     offset = int(request.args.get('offset', 0))
 
     if not query:
-        return jsonify({'results': [], 'total': 0, 'query': query})
+        return json_response({'results': [], 'total': 0, 'query': query})
 
     # Check if query is an exact phrase (in quotes)
     exact_phrase = query.startswith('"') and query.endswith('"')
     if exact_phrase:
         query = query[1:-1]  # Remove quotes
 
-    with get_db() as conn:
-        cursor = conn.cursor()
-        results = []
-        total = 0
-        search_mode = 'exact_phrase' if exact_phrase else ('fuzzy' if fuzzy else 'keywords')
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.row_factory = None  # Plain tuples for _make_result_row
+    results = []
+    total = 0
+    search_mode = 'exact_phrase' if exact_phrase else ('fuzzy' if fuzzy else 'keywords')
 
-        try:
-            if exact_phrase:
-                # Exact phrase matching using LIKE
-                like_pattern = f'%{query}%'
-
-                cursor.execute("""
-                    SELECT COUNT(*) FROM chunks WHERE text LIKE ?
-                """, (like_pattern,))
-                total = cursor.fetchone()[0]
-
-                cursor.execute("""
-                    SELECT uid, doc_id, source_file, text, cluster_id, token_count
+    try:
+        if exact_phrase:
+            # Exact phrase matching using LIKE; the window runs over
+            # matching rowids only, then the page is joined back
+            like_pattern = f'%{query}%'
+            cursor.execute("""
+                SELECT c.uid, c.doc_id, c.source_file, c.text, c.cluster_id, c.token_count,
+                       p.total_count
+                FROM (
+                    SELECT rowid AS rid, COUNT(*) OVER () AS total_count
                     FROM chunks WHERE text LIKE ?
                     LIMIT ? OFFSET ?
-                """, (like_pattern, limit, offset))
-
-            elif fuzzy:
-                # Build fuzzy patterns for typo-tolerant search
-                patterns = build_fuzzy_pattern(query)
-
-                # Build OR condition for all patterns (limit to first 5 for performance)
-                conditions = ' OR '.join(['LOWER(text) LIKE ?' for _ in patterns[:5]])
-
-                # Count total (approximate - just use first pattern for speed)
-                cursor.execute(f"""
-                    SELECT COUNT(*) FROM chunks
-                    WHERE {conditions}
-                """, patterns[:5])
-                total = cursor.fetchone()[0]
-
-                # Get results
-                cursor.execute(f"""
-                    SELECT DISTINCT uid, doc_id, source_file, text, cluster_id, token_count
-                    FROM chunks
-                    WHERE {conditions}
-                    LIMIT ? OFFSET ?
-                """, patterns[:5] + [limit, offset])
-            else:
-                # Use FTS for keyword matching (faster, but splits on words)
-                fts_query = ' OR '.join(query.split())
-
-                # Count total
-                cursor.execute("""
-                    SELECT COUNT(*) FROM chunks_fts WHERE chunks_fts MATCH ?
-                """, (fts_query,))
-                total = cursor.fetchone()[0]
+                ) p
+                INNER JOIN chunks c ON c.rowid = p.rid
+            """, (like_pattern, limit, offset))
+            results, total = _page_results(
+                cursor, query, offset,
+                "SELECT COUNT(*) FROM chunks WHERE text LIKE ?", (like_pattern,)
+            )
 
-                # Get results with join
+        elif fuzzy:
+            # Prefix-match candidates from the FTS index, then rerank the top
+            # FUZZY_CANDIDATES for typo-tolerant ordering; deeper pages keep
+            # FTS rank order
+            fts_query = fuzzy_fts_query(query)
+            rows = []
+            if fts_query:
                 cursor.execute("""
                     SELECT c.uid, c.doc_id, c.source_file, c.text, c.cluster_id, c.token_count
                     FROM chunks c
                     INNER JOIN chunks_fts fts ON c.uid = fts.uid
                     WHERE chunks_fts MATCH ?
-                    LIMIT ? OFFSET ?
-                """, (fts_query, limit, offset))
-
-            for row in cursor.fetchall():
-                text = row['text'] or ''
-                results.append({
-                    'uid': row['uid'],
-                    'doc_id': row['doc_id'],
-                    'source_file': row['source_file'],
-                    'text': text[:500] + ('...' if len(text) > 500 else ''),
-                    'text_highlighted': highlight_text(text[:500], query) + ('...' if len(text) > 500 else ''),
-                    'cluster_id': row['cluster_id'],
-                    'token_count': row['token_count']
-                })
-
-        except Exception as e:
-            # Fallback to simple LIKE search
-            like_pattern = f'%{query}%'
-            cursor.execute("""
-                SELECT COUNT(*) FROM chunks WHERE text LIKE ?
-            """, (like_pattern,))
-            total = cursor.fetchone()[0]
+                    ORDER BY fts.rank
+                    LIMIT ?
+                """, (fts_query, max(FUZZY_CANDIDATES, offset + limit)))
+                rows = cursor.fetchall()
+                rows = rerank_fuzzy(query, rows[:FUZZY_CANDIDATES]) + rows[FUZZY_CANDIDATES:]
+
+                cursor.execute("SELECT COUNT(*) FROM chunks_fts WHERE chunks_fts MATCH ?",
+                               (fts_query,))
+                total = cursor.fetchone()[0]
+
+            results = [_make_result_row(row, query) for row in rows[offset:offset + limit]]
+        else:
+            # Use FTS for keyword matching (faster, but splits on words)
+            fts_query = ' OR '.join(query.split())
 
+            # Count and page over matching uids, then join the page back
             cursor.execute("""
-                SELECT uid, doc_id, source_file, text, cluster_id, token_count
+                SELECT c.uid, c.doc_id, c.source_file, c.text, c.cluster_id, c.token_count,
+                       p.total_count
+                FROM (
+                    SELECT uid, COUNT(*) OVER () AS total_count
+                    FROM chunks_fts WHERE chunks_fts MATCH ?
+                    LIMIT ? OFFSET ?
+                ) p
+                INNER JOIN chunks c ON c.uid = p.uid
+            """, (fts_query, limit, offset))
+            results, total = _page_results(
+                cursor, query, offset,
+                "SELECT COUNT(*) FROM chunks_fts WHERE chunks_fts MATCH ?", (fts_query,)
+            )
+
+    except Exception as e:
+        # Fallback to simple LIKE search
+        like_pattern = f'%{query}%'
+        cursor.execute("""
+            SELECT c.uid, c.doc_id, c.source_file, c.text, c.cluster_id, c.token_count,
+                   p.total_count
+            FROM (
+                SELECT rowid AS rid, COUNT(*) OVER () AS total_count
                 FROM chunks WHERE text LIKE ?
                 LIMIT ? OFFSET ?
-            """, (like_pattern, limit, offset))
+            ) p
+            INNER JOIN chunks c ON c.rowid = p.rid
+        """, (like_pattern, limit, offset))
 
-            for row in cursor.fetchall():
-                text = row['text'] or ''
-                results.append({
-                    'uid': row['uid'],
-                    'doc_id': row['doc_id'],
-                    'source_file': row['source_file'],
-                    'text': text[:500] + ('...' if len(text) > 500 else ''),
-                    'text_highlighted': highlight_text(text[:500], query) + ('...' if len(text) > 500 else ''),
-                    'cluster_id': row['cluster_id'],
-                    'token_count': row['token_count']
-                })
-
-        # Determine search mode for frontend display
-        if exact_phrase:
-            search_mode = 'exact'
-        elif fuzzy:
-            search_mode = 'fuzzy'
-        elif ' ' in query:
-            search_mode = 'any_word'
-        else:
-            search_mode = 'standard'
-
-        return jsonify({
-            'results': results,
-            'total': total,
-            'query': query,
-            'fuzzy': fuzzy,
-            'search_mode': search_mode,
-            'limit': limit,
-            'offset': offset
-        })
+        results, total = _page_results(
+            cursor, query, offset,
+            "SELECT COUNT(*) FROM chunks WHERE text LIKE ?", (like_pattern,)
+        )
+
+    # Determine search mode for frontend display
+    if exact_phrase:
+        search_mode = 'exact'
+    elif fuzzy:
+        search_mode = 'fuzzy'
+    elif ' ' in query:
+        search_mode = 'any_word'
+    else:
+        search_mode = 'standard'
+
+    return json_response({
+        'results': results,
+        'total': total,
+        'query': query,
+        'fuzzy': fuzzy,
+        'search_mode': search_mode,
+        'limit': limit,
+        'offset': offset
+    })
 
 @app.route('/api/search/combined')
 def search_combined():
@@ -297,317 +514,375 @@ def search_combined():
     unique = request.args.get('unique', 'true').lower() == 'true'  # Default to unique
 
     if not terms_param:
-        return jsonify({'results': [], 'total': 0, 'terms': []})
+        return json_response({'results': [], 'total': 0, 'terms': []})
 
     # Parse comma-separated terms
     terms = [t.strip() for t in terms_param.split(',') if t.strip()]
 
     if not terms:
-        return jsonify({'results': [], 'total': 0, 'terms': []})
-
-    with get_db() as conn:
-        cursor = conn.cursor()
-        results = []
-
-        # Build AND conditions - each term must appear in the text
-        conditions = ' AND '.join(['text LIKE ?' for _ in terms])
-        params = [f'%{term}%' for term in terms]
-
-        if unique:
-            # Count unique documents
-            cursor.execute(f"""
-                SELECT COUNT(DISTINCT doc_id) FROM chunks WHERE {conditions}
-            """, params)
-            total = cursor.fetchone()[0]
-
-            # Get results and deduplicate in Python - fetch more to ensure we have enough unique docs
-            # Prioritize shorter texts (cryptic emails are often more interesting)
-            cursor.execute(f"""
-                SELECT uid, doc_id, source_file, text, cluster_id, token_count
-                FROM chunks WHERE {conditions}
-                ORDER BY LENGTH(text) ASC
+        return json_response({'results': [], 'total': 0, 'terms': []})
+
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.row_factory = None  # Plain tuples for _make_result_row
+
+    # Build AND conditions - each term must appear in the text
+    conditions = ' AND '.join(['text LIKE ?' for _ in terms])
+    params = [f'%{term}%' for term in terms]
+
+    if unique:
+        count_sql = f"SELECT COUNT(DISTINCT doc_id) FROM chunks WHERE {conditions}"
+
+        # Keep each document's shortest matching chunk, then page through those;
+        # the window total counts unique documents. Windows run over rowids
+        # and lengths only, and the page is joined back for its text
+        # Prioritize shorter texts (cryptic emails are often more interesting)
+        cursor.execute(f"""
+            SELECT c.uid, c.doc_id, c.source_file, c.text, c.cluster_id, c.token_count,
+                   p.total_count
+            FROM (
+                SELECT rid, len, COUNT(*) OVER () AS total_count
+                FROM (
+                    SELECT rowid AS rid, LENGTH(text) AS len,
+                           ROW_NUMBER() OVER (PARTITION BY doc_id ORDER BY LENGTH(text)) AS rn
+                    FROM chunks WHERE {conditions}
+                )
+                WHERE rn = 1
+                ORDER BY len ASC
                 LIMIT ? OFFSET ?
-            """, params + [limit * 5, offset * 5])  # Fetch more to account for duplicates
-
-            # Deduplicate by doc_id, keeping shortest/most cryptic text
-            seen_docs = set()
-            unique_results = []
-            for row in cursor.fetchall():
-                if row['doc_id'] not in seen_docs:
-                    seen_docs.add(row['doc_id'])
-                    unique_results.append(row)
-                    if len(unique_results) >= limit:
-                        break
-
-            # Use the deduplicated results
-            cursor_results = unique_results
-        else:
-            # Count total chunks
-            cursor.execute(f"""
-                SELECT COUNT(*) FROM chunks WHERE {conditions}
-            """, params)
-            total = cursor.fetchone()[0]
-
-            # Get all matching chunks
-            cursor.execute(f"""
-                SELECT uid, doc_id, source_file, text, cluster_id, token_count
+            ) p
+            INNER JOIN chunks c ON c.rowid = p.rid
+            ORDER BY p.len ASC
+        """, params + [limit, offset])
+    else:
+        count_sql = f"SELECT COUNT(*) FROM chunks WHERE {conditions}"
+
+        # Count and page over matching rowids, then join the page back
+        cursor.execute(f"""
+            SELECT c.uid, c.doc_id, c.source_file, c.text, c.cluster_id, c.token_count,
+                   p.total_count
+            FROM (
+                SELECT rowid AS rid, COUNT(*) OVER () AS total_count
                 FROM chunks WHERE {conditions}
                 LIMIT ? OFFSET ?
-            """, params + [limit, offset])
-            cursor_results = cursor.fetchall()
-
-        for row in cursor_results:
-            text = row['text'] or ''
-            # Highlight all terms
-            highlighted = text[:500]
-            for term in terms:
-                highlighted = highlight_text(highlighted, term)
-
-            results.append({
-                'uid': row['uid'],
-                'doc_id': row['doc_id'],
-                'source_file': row['source_file'],
-                'text': text[:500] + ('...' if len(text) > 500 else ''),
-                'text_highlighted': highlighted + ('...' if len(text) > 500 else ''),
-                'cluster_id': row['cluster_id'],
-                'token_count': row['token_count']
-            })
-
-        return jsonify({
-            'results': results,
-            'total': total,
-            'terms': terms,
-            'search_mode': 'combined',
-            'limit': limit,
-            'offset': offset
-        })
+            ) p
+            INNER JOIN chunks c ON c.rowid = p.rid
+        """, params + [limit, offset])
+
+    # One pattern covering every word of every term, built once for all rows
+    pattern = highlight_pattern(tuple(word for term in terms for word in term.split()))
+
+    results, total = _page_results(cursor, pattern, offset, count_sql, params)
+
+    return json_response({
+        'results': results,
+        'total': total,
+        'terms': terms,
+        'search_mode': 'combined',
+        'limit': limit,
+        'offset': offset
+    })
 
 @app.route('/api/suggest')
 def suggest():
     """
     Get search suggestions for autocomplete.
-    Extracts common terms from matching documents.
+    Returns words starting with the query, most common first.
     """
-    query = request.args.get('q', '').strip()
+    query = request.args.get('q', '').strip().lower()
     if len(query) < 2:
-        return jsonify({'suggestions': []})
-
-    with get_db() as conn:
-        cursor = conn.cursor()
-
-        # Get sample of matching texts
-        cursor.execute("""
-            SELECT text FROM chunks
-            WHERE text LIKE ?
-            LIMIT 100
-        """, (f'%{query}%',))
-
-        # Extract unique words that match the query prefix
-        suggestions = set()
-        pattern = re.compile(r'\b' + re.escape(query) + r'\w*', re.IGNORECASE)
-
-        for row in cursor.fetchall():
-            if row['text']:
-                matches = pattern.findall(row['text'])
-                suggestions.update(m.lower() for m in matches)
-
-        # Sort by length and return top suggestions
-        sorted_suggestions = sorted(suggestions, key=len)[:10]
-
-        return jsonify({'suggestions': sorted_suggestions})
+        return json_response({'suggestions': []})
+
+    conn = get_db()
+    cursor = conn.cursor()
+
+    # Range scan over the FTS dictionary: every term with the query as prefix
+    upper = query[:-1] + chr(ord(query[-1]) + 1)
+    cursor.execute("""
+        SELECT term FROM chunks_vocab
+        WHERE term >= ? AND term < ?
+        ORDER BY doc DESC
+        LIMIT 10
+    """, (query, upper))
+    terms = [row['term'] for row in cursor.fetchall()]
+
+    # Terms may be tokenizer stems (maxwel); suggest the spellings used in
+    # the text instead, and drop terms with none starting with the query
+    version = _db_version()
+    suggestions = []
+    for term in terms:
+        for word in surface_forms(term, version):
+            if word.startswith(query) and word not in suggestions:
+                suggestions.append(word)
+
+    suggestions = suggestions[:10]
+
+    return json_response({'suggestions': suggestions})
 
 @app.route('/api/document/<doc_id>')
 def get_document(doc_id):
     """Get full document with all its chunks."""
-    with get_db() as conn:
-        cursor = conn.cursor()
-
-        # Get document metadata
-        cursor.execute("""
-            SELECT doc_id, meta_json FROM docs WHERE doc_id = ?
-        """, (doc_id,))
-        doc_row = cursor.fetchone()
-
-        if not doc_row:
-            return jsonify({'error': 'Document not found'}), 404
-
-        meta = json.loads(doc_row['meta_json']) if doc_row['meta_json'] else {}
+    conn = get_db()
+    cursor = conn.cursor()
+
+    # Get document metadata
+    cursor.execute("""
+        SELECT doc_id, meta_json FROM docs WHERE doc_id = ?
+    """, (doc_id,))
+    doc_row = cursor.fetchone()
+
+    if not doc_row:
+        return json_response({'error': 'Document not found'}), 404
+
+    meta = json.loads(doc_row['meta_json']) if doc_row['meta_json'] else {}
+
+    # Get all chunks for this document
+    cursor.execute("""
+        SELECT uid, chunk_id, order_index, text, cluster_id, token_count
+        FROM chunks
+        WHERE doc_id = ?
+        ORDER BY order_index
+    """, (doc_id,))
+
+    chunks = []
+    full_text = []
+    for row in cursor.fetchall():
+        chunks.append({
+            'uid': row['uid'],
+            'chunk_id': row['chunk_id'],
+            'order_index': row['order_index'],
+            'text': row['text'],
+            'cluster_id': row['cluster_id'],
+            'token_count': row['token_count']
+        })
+        if row['text']:
+            full_text.append(row['text'])
+
+    return json_response({
+        'doc_id': doc_id,
+        'meta': meta,
+        'chunks': chunks,
+        'full_text': '\n\n'.join(full_text),
+        'chunk_count': len(chunks)
+    })
+
+def _clean_preview(text):
+    """Collapse whitespace, strip boilerplate and truncate text for a tooltip."""
+    # Clean and truncate
+    text = _WS_RE.sub(' ', text).strip()
+    # Remove common boilerplate
+    text = _BOILERPLATE_RE.sub('', text)
+    text = _EFTA_RE.sub('', text)
+    return text[:150].strip()
+
+@lru_cache(maxsize=1)
+def _load_clusters(db_version):
+    """
+    Precompute the cluster list and every cluster's tooltip preview as
+    serialized JSON, since both are static for a given database.
+    Returns (clusters_json, {cluster_id: preview_json}).
+    """
+    conn = get_db()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT cluster_id, n_chunks, prob_avg, bm25_density_avg, token_count_avg
+        FROM cluster_summary
+        ORDER BY n_chunks DESC
+    """)
+
+    clusters = []
+    for row in cursor.fetchall():
+        clusters.append({
+            'cluster_id': row['cluster_id'],
+            'n_chunks': row['n_chunks'],
+            'prob_avg': row['prob_avg'],
+            'bm25_density_avg': row['bm25_density_avg'],
+            'token_count_avg': row['token_count_avg']
+        })
 
-        # Get all chunks for this document
-        cursor.execute("""
-            SELECT uid, chunk_id, order_index, text, cluster_id, token_count
-            FROM chunks
-            WHERE doc_id = ?
-            ORDER BY order_index
-        """, (doc_id,))
-
-        chunks = []
-        full_text = []
-        for row in cursor.fetchall():
-            chunks.append({
-                'uid': row['uid'],
-                'chunk_id': row['chunk_id'],
-                'order_index': row['order_index'],
-                'text': row['text'],
-                'cluster_id': row['cluster_id'],
-                'token_count': row['token_count']
-            })
-            if row['text']:
-                full_text.append(row['text'])
-
-        return jsonify({
-            'doc_id': doc_id,
-            'meta': meta,
-            'chunks': chunks,
-            'full_text': '\n\n'.join(full_text),
-            'chunk_count': len(chunks)
+    # 3 short representative samples per cluster, in one pass. The window
+    # runs over rowids only and the winners are joined back for their text
+    cursor.execute("""
+        SELECT p.cluster_id, c.text
+        FROM (
+            SELECT rid, cluster_id, rn FROM (
+                SELECT rowid AS rid, cluster_id,
+                       ROW_NUMBER() OVER (PARTITION BY cluster_id ORDER BY cluster_prob DESC) AS rn
+                FROM chunks
+                WHERE cluster_id IS NOT NULL AND text IS NOT NULL AND LENGTH(text) > 50
+            )
+            WHERE rn <= 3
+        ) p
+        INNER JOIN chunks c ON c.rowid = p.rid
+        ORDER BY p.cluster_id, p.rn
+    """)
+
+    previews = {}
+    for row in cursor.fetchall():
+        text = _clean_preview(row['text'])
+        if text:
+            previews.setdefault(row['cluster_id'], []).append(text + '...')
+
+    sizes = {cluster['cluster_id']: cluster['n_chunks'] for cluster in clusters}
+    preview_json = {
+        cluster_id: dumps_json({
+            'cluster_id': cluster_id,
+            'n_chunks': sizes.get(cluster_id, 0),
+            'previews': previews.get(cluster_id, [])
         })
+        for cluster_id in sizes.keys() | previews.keys()
+    }
+
+    return dumps_json({'clusters': clusters}), preview_json
 
 @app.route('/api/clusters')
 def get_clusters():
     """Get cluster summaries for visualization."""
-    with get_db() as conn:
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT cluster_id, n_chunks, prob_avg, bm25_density_avg, token_count_avg
-            FROM cluster_summary
-            ORDER BY n_chunks DESC
-        """)
-
-        clusters = []
-        for row in cursor.fetchall():
-            clusters.append({
-                'cluster_id': row['cluster_id'],
-                'n_chunks': row['n_chunks'],
-                'prob_avg': row['prob_avg'],
-                'bm25_density_avg': row['bm25_density_avg'],
-                'token_count_avg': row['token_count_avg']
-            })
-
-        return jsonify({'clusters': clusters})
+    clusters_json, _ = _load_clusters(_db_version())
+    return Response(clusters_json, mimetype='application/json')
 
 @app.route('/api/cluster/<int:cluster_id>')
 def get_cluster_samples(cluster_id):
     """Get sample documents from a specific cluster."""
     limit = min(int(request.args.get('limit', 20)), 100)
 
-    with get_db() as conn:
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT uid, doc_id, source_file, text, cluster_prob
-            FROM chunks
-            WHERE cluster_id = ?
-            ORDER BY cluster_prob DESC
-            LIMIT ?
-        """, (cluster_id, limit))
-
-        samples = []
-        for row in cursor.fetchall():
-            text = row['text'] or ''
-            samples.append({
-                'uid': row['uid'],
-                'doc_id': row['doc_id'],
-                'source_file': row['source_file'],
-                'text': text[:300] + ('...' if len(text) > 300 else ''),
-                'cluster_prob': row['cluster_prob']
-            })
+    conn = get_db()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT uid, doc_id, source_file, text, cluster_prob
+        FROM chunks
+        WHERE cluster_id = ?
+        ORDER BY cluster_prob DESC
+        LIMIT ?
+    """, (cluster_id, limit))
+
+    samples = []
+    for row in cursor.fetchall():
+        text = row['text'] or ''
+        samples.append({
+            'uid': row['uid'],
+            'doc_id': row['doc_id'],
+            'source_file': row['source_file'],
+            'text': text[:300] + ('...' if len(text) > 300 else ''),
+            'cluster_prob': row['cluster_prob']
+        })
 
-        return jsonify({'cluster_id': cluster_id, 'samples': samples})
+    return json_response({'cluster_id': cluster_id, 'samples': samples})
 
 @app.route('/api/cluster/<int:cluster_id>/preview')
 def get_cluster_preview(cluster_id):
     """Get a quick preview of cluster contents for tooltips."""
-    with get_db() as conn:
-        cursor = conn.cursor()
-
-        # Get 3 short representative samples
-        cursor.execute("""
-            SELECT text FROM chunks
-            WHERE cluster_id = ? AND text IS NOT NULL AND LENGTH(text) > 50
-            ORDER BY cluster_prob DESC
-            LIMIT 3
-        """, (cluster_id,))
-
-        previews = []
-        for row in cursor.fetchall():
-            text = row[0]
-            # Clean and truncate
-            text = re.sub(r'\s+', ' ', text).strip()
-            # Remove common boilerplate
-            text = re.sub(r'please note.*?privileged.*?$', '', text, flags=re.IGNORECASE|re.DOTALL)
-            text = re.sub(r'EFTA.*?\d+', '', text)
-            text = text[:150].strip()
-            if text:
-                previews.append(text + '...')
-
-        # Get cluster size
-        cursor.execute("""
-            SELECT n_chunks FROM cluster_summary WHERE cluster_id = ?
-        """, (cluster_id,))
-        row = cursor.fetchone()
-        n_chunks = row[0] if row else 0
-
-        return jsonify({
-            'cluster_id': cluster_id,
-            'n_chunks': n_chunks,
-            'previews': previews
-        })
+    _, preview_json = _load_clusters(_db_version())
+    body = preview_json.get(cluster_id)
+    if body is None:
+        body = dumps_json({'cluster_id': cluster_id, 'n_chunks': 0, 'previews': []})
+    return Response(body, mimetype='application/json')
+
+@lru_cache(maxsize=1)
+def _rowid_range(db_version):
+    """(min rowid, max rowid, row count) of chunks, for random sampling by key."""
+    row = get_db().execute("SELECT MIN(rowid), MAX(rowid), COUNT(*) FROM chunks").fetchone()
+    return tuple(row)
+
+def _sample_rowids(low, high, k, tried):
+    """
+    k distinct rowids from [low, high] not already in tried, which is
+    updated in place. Rejection sampling while most of the range is
+    untried, otherwise a draw from what is left.
+    """
+    if len(tried) * 2 < high - low + 1:
+        picked = set()
+        while len(picked) < k:
+            rowid = random.randint(low, high)
+            if rowid not in tried:
+                picked.add(rowid)
+        picked = list(picked)
+    else:
+        picked = random.sample(sorted(set(range(low, high + 1)) - tried), k)
+    tried.update(picked)
+    return picked
 
 @app.route('/api/random')
 def get_random_samples():
     """Get random document samples for exploration."""
     limit = min(int(request.args.get('limit', 10)), 50)
 
-    with get_db() as conn:
-        cursor = conn.cursor()
-
+    conn = get_db()
+    cursor = conn.cursor()
+
+    low, high, total = _rowid_range(_db_version())
+    wanted = min(limit, total)
+    rows = []
+    if total:
+        # Pick random rowids and fetch them by primary key, over-sampling
+        # to absorb gaps in the rowid sequence; draw again for any shortfall
+        span = high - low + 1
+        tried = set()
+        for _ in range(RANDOM_DRAWS):
+            shortfall = wanted - len(rows)
+            if shortfall <= 0 or len(tried) >= span:
+                break
+            k = min(span - len(tried), RANDOM_MAX_CANDIDATES,
+                    math.ceil(shortfall * 1.2 * span / total))
+            candidates = _sample_rowids(low, high, k, tried)
+            cursor.execute(f"""
+                SELECT uid, doc_id, source_file, text, cluster_id
+                FROM chunks
+                WHERE rowid IN ({','.join('?' * k)})
+            """, candidates)
+            rows.extend(cursor.fetchall())
+        random.shuffle(rows)
+
+    if len(rows) < wanted:
+        # Rowids too sparse to sample; fall back to sorting the whole table
         cursor.execute("""
             SELECT uid, doc_id, source_file, text, cluster_id
             FROM chunks
             ORDER BY RANDOM()
             LIMIT ?
         """, (limit,))
+        rows = cursor.fetchall()
+
+    samples = []
+    for row in rows[:limit]:
+        text = row['text'] or ''
+        samples.append({
+            'uid': row['uid'],
+            'doc_id': row['doc_id'],
+            'source_file': row['source_file'],
+            'text': text[:400] + ('...' if len(text) > 400 else ''),
+            'cluster_id': row['cluster_id']
+        })
 
-        samples = []
-        for row in cursor.fetchall():
-            text = row['text'] or ''
-            samples.append({
-                'uid': row['uid'],
-                'doc_id': row['doc_id'],
-                'source_file': row['source_file'],
-                'text': text[:400] + ('...' if len(text) > 400 else ''),
-                'cluster_id': row['cluster_id']
-            })
-
-        return jsonify({'samples': samples})
+    return json_response({'samples': samples})
 
 @app.route('/api/source-files')
 def get_source_files():
     """Get list of unique source file patterns."""
-    with get_db() as conn:
-        cursor = conn.cursor()
+    conn = get_db()
+    cursor = conn.cursor()
 
-        # Get sample of source files to understand structure
-        cursor.execute("""
-            SELECT DISTINCT source_file FROM chunks LIMIT 1000
-        """)
+    # Get sample of source files to understand structure
+    cursor.execute("""
+        SELECT DISTINCT source_file FROM chunks LIMIT 1000
+    """)
 
-        files = [row['source_file'] for row in cursor.fetchall()]
+    files = [row['source_file'] for row in cursor.fetchall()]
 
-        # Extract folder patterns
-        folders = set()
-        for f in files:
-            if f:
-                parts = f.split('/')
-                if len(parts) > 2:
-                    folders.add('/'.join(parts[:-1]))
+    # Extract folder patterns
+    folders = set()
+    for f in files:
+        if f:
+            parts = f.split('/')
+            if len(parts) > 2:
+                folders.add('/'.join(parts[:-1]))
 
-        return jsonify({
-            'sample_files': files[:100],
-            'folders': sorted(folders)[:50]
-        })
+    return json_response({
+        'sample_files': files[:100],
+        'folders': sorted(folders)[:50]
+    })
 
 # Pre-computed list of notable people to search for
 NOTABLE_PEOPLE = [
@@ -629,40 +904,49 @@ KEY_LOCATIONS = [
     'Deutsche Bank', 'Bear Stearns', 'Victoria\'s Secret', 'Wexner Foundation'
 ]
 
+@lru_cache(maxsize=4)
+def _count_mentions(names, db_version):
+    """
+    Count chunks mentioning each name, using FTS5 phrase queries so each
+    lookup reads the posting lists instead of scanning every chunk's text.
+    Cached per database version since the name lists are constants.
+    """
+    conn = get_db()
+    cursor = conn.cursor()
+
+    # One statement for the whole list: a VALUES table of (name, phrase)
+    # with a correlated FTS count per row
+    values = ', '.join(['(?, ?)'] * len(names))
+    params = [value for name in names for value in (name, fts_phrase(name))]
+    cursor.execute(f"""
+        WITH names(name, phrase) AS (VALUES {values})
+        SELECT name,
+               (SELECT COUNT(*) FROM chunks_fts WHERE chunks_fts MATCH names.phrase) AS count
+        FROM names
+    """, params)
+
+    counts = [
+        {'name': row['name'], 'count': row['count']}
+        for row in cursor.fetchall()
+        if row['count'] > 0
+    ]
+
+    # Sort by count descending
+    counts.sort(key=lambda x: x['count'], reverse=True)
+    return counts
+
 @app.route('/api/people')
 def get_people():
     """
     Return list of notable people found in corpus with mention counts.
     Pre-computed list includes key figures associated with the Epstein case.
     """
-    with get_db() as conn:
-        cursor = conn.cursor()
+    people_counts = _count_mentions(tuple(NOTABLE_PEOPLE), _db_version())
 
-        people_counts = []
-
-        for person in NOTABLE_PEOPLE:
-            # Use case-insensitive search for each person
-            # Search for full name and also last name for common references
-            like_pattern = f'%{person}%'
-
-            cursor.execute("""
-                SELECT COUNT(*) FROM chunks WHERE LOWER(text) LIKE LOWER(?)
-            """, (like_pattern,))
-            count = cursor.fetchone()[0]
-
-            if count > 0:
-                people_counts.append({
-                    'name': person,
-                    'count': count
-                })
-
-        # Sort by count descending
-        people_counts.sort(key=lambda x: x['count'], reverse=True)
-
-        return jsonify({
-            'people': people_counts,
-            'total_people': len(people_counts)
-        })
+    return json_response({
+        'people': people_counts,
+        'total_people': len(people_counts)
+    })
 
 @app.route('/api/places')
 def get_places():
@@ -670,32 +954,46 @@ def get_places():
     Return list of key locations with mention counts.
     Includes locations relevant to the Epstein case.
     """
-    with get_db() as conn:
-        cursor = conn.cursor()
-
-        places_counts = []
-
-        for place in KEY_LOCATIONS:
-            like_pattern = f'%{place}%'
+    places_counts = _count_mentions(tuple(KEY_LOCATIONS), _db_version())
+
+    return json_response({
+        'places': places_counts,
+        'total_places': len(places_counts)
+    })
+
+@lru_cache(maxsize=1)
+def _compute_timeline(db_version):
+    """Count year mentions (1990-2025) across the whole corpus."""
+    conn = get_db()
+    cursor = conn.cursor()
+
+    if not _table_exists(conn, 'chunk_years'):
+        # Read-only database: build the same rows in a connection-local temp
+        # table so the text never leaves SQLite as Python row objects
+        cursor.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS chunk_years AS
+            {_CHUNK_YEARS_SELECT}
+        """)
 
-            cursor.execute("""
-                SELECT COUNT(*) FROM chunks WHERE LOWER(text) LIKE LOWER(?)
-            """, (like_pattern,))
-            count = cursor.fetchone()[0]
-
-            if count > 0:
-                places_counts.append({
-                    'name': place,
-                    'count': count
-                })
-
-        # Sort by count descending
-        places_counts.sort(key=lambda x: x['count'], reverse=True)
-
-        return jsonify({
-            'places': places_counts,
-            'total_places': len(places_counts)
-        })
+    # Aggregate the materialized year mentions (1990-2025)
+    cursor.execute("""
+        SELECT year, COUNT(*) FROM chunk_years
+        WHERE year BETWEEN 1990 AND 2025
+        GROUP BY year
+    """)
+    year_counts = {row[0]: row[1] for row in cursor.fetchall()}
+
+    # Convert to sorted list format for easier visualization
+    timeline_data = [
+        {'year': year, 'count': count}
+        for year, count in sorted(year_counts.items())
+    ]
+
+    return {
+        'timeline': timeline_data,
+        'year_counts': year_counts,
+        'total_years': len(year_counts)
+    }
 
 @app.route('/api/timeline')
 def get_timeline():
@@ -703,37 +1001,7 @@ def get_timeline():
     Return document counts by year for visualization.
     Extracts years from text content and returns {year: count} data.
     """
-    with get_db() as conn:
-        cursor = conn.cursor()
-
-        # Get all text chunks to extract years
-        cursor.execute("""
-            SELECT text FROM chunks WHERE text IS NOT NULL
-        """)
-
-        year_counts = {}
-        year_pattern = re.compile(r'\b(19[89]\d|20[0-2]\d)\b')  # Match years 1980-2029
-
-        for row in cursor.fetchall():
-            text = row['text'] or ''
-            years_found = year_pattern.findall(text)
-            for year in years_found:
-                year_int = int(year)
-                # Filter to reasonable range (1990-2025)
-                if 1990 <= year_int <= 2025:
-                    year_counts[year_int] = year_counts.get(year_int, 0) + 1
-
-        # Convert to sorted list format for easier visualization
-        timeline_data = [
-            {'year': year, 'count': count}
-            for year, count in sorted(year_counts.items())
-        ]
-
-        return jsonify({
-            'timeline': timeline_data,
-            'year_counts': year_counts,
-            'total_years': len(year_counts)
-        })
+    return json_response(_compute_timeline(_db_version()))
 
 @app.route('/api/connections/<name>')
 def get_connections(name):
@@ -745,50 +1013,65 @@ def get_connections(name):
     offset = int(request.args.get('offset', 0))
 
     if not name:
-        return jsonify({'error': 'Name parameter is required'}), 400
-
-    with get_db() as conn:
-        cursor = conn.cursor()
-
-        like_pattern = f'%{name}%'
-
-        # Get total count
-        cursor.execute("""
-            SELECT COUNT(*) FROM chunks WHERE LOWER(text) LIKE LOWER(?)
-        """, (like_pattern,))
-        total = cursor.fetchone()[0]
-
-        # Get paginated results
-        cursor.execute("""
-            SELECT uid, doc_id, source_file, text, cluster_id, token_count
+        return json_response({'error': 'Name parameter is required'}), 400
+
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.row_factory = None  # Plain tuples for _make_result_row
+
+    like_pattern = f'%{name}%'
+
+    # Count and page over matching rowids, then join the page back.
+    # LIKE already ignores ASCII case, the same folding LOWER() does, so
+    # no per-row lowercasing is needed
+    cursor.execute("""
+        SELECT c.uid, c.doc_id, c.source_file, c.text, c.cluster_id, c.token_count,
+               p.total_count
+        FROM (
+            SELECT rowid AS rid, COUNT(*) OVER () AS total_count
             FROM chunks
-            WHERE LOWER(text) LIKE LOWER(?)
+            WHERE text LIKE ?
             LIMIT ? OFFSET ?
-        """, (like_pattern, limit, offset))
-
-        results = []
-        for row in cursor.fetchall():
-            text = row['text'] or ''
-            results.append({
-                'uid': row['uid'],
-                'doc_id': row['doc_id'],
-                'source_file': row['source_file'],
-                'text': text[:500] + ('...' if len(text) > 500 else ''),
-                'text_highlighted': highlight_text(text[:500], name) + ('...' if len(text) > 500 else ''),
-                'cluster_id': row['cluster_id'],
-                'token_count': row['token_count']
-            })
-
-        return jsonify({
-            'name': name,
-            'results': results,
-            'total': total,
-            'limit': limit,
-            'offset': offset
-        })
+        ) p
+        INNER JOIN chunks c ON c.rowid = p.rid
+    """, (like_pattern, limit, offset))
+
+    results, total = _page_results(
+        cursor, name, offset,
+        "SELECT COUNT(*) FROM chunks WHERE text LIKE ?", (like_pattern,)
+    )
+
+    return json_response({
+        'name': name,
+        'results': results,
+        'total': total,
+        'limit': limit,
+        'offset': offset
+    })
+
+def warm_caches():
+    """
+    Run the corpus-wide queries once so their cached results are ready
+    before the first request. wsgi.py calls this before gunicorn forks,
+    so workers share the results copy-on-write.
+    """
+    if not os.path.exists(DB_PATH):
+        return
+    # Open the connection first: its schema migration can rewrite the file,
+    # and the version stamp must be read after that
+    get_db()
+    version = _db_version()
+    _compute_stats(version)
+    _count_mentions(tuple(NOTABLE_PEOPLE), version)
+    _count_mentions(tuple(KEY_LOCATIONS), version)
+    _compute_timeline(version)
+    _load_clusters(version)
+    _rowid_range(version)
 
 if __name__ == '__main__':
     print("Starting Epstein Corpus Explorer API...")
     print(f"Database: {DB_PATH}")
     print("Open http://localhost:5001 in your browser")
-    app.run(host='0.0.0.0', port=5001, debug=True)
+    # Single-threaded so the one connection is reused across requests; the
+    # threaded dev server starts a thread, and a connection, per request
+    app.run(host='0.0.0.0', port=5001, debug=True, threaded=False)
@@ -0,0 +1,19 @@
+"""
+Gunicorn settings for the Corpus Explorer API.
+The app is preloaded in the master so its startup caches are forked to
+every worker copy-on-write; gthread workers serve requests concurrently.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+preload_app = True
+
+
+def post_fork(server, worker):
+    """Size the worker's per-thread SQLite page caches by its thread count."""
+    import app
+    app.set_db_threads(worker.cfg.threads)
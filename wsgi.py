@@ -0,0 +1,8 @@
+"""
+WSGI entrypoint for gunicorn: gunicorn -c gunicorn_conf.py wsgi:app
+Warms the API caches at import so a preloaded master shares them with workers.
+"""
+
+from app import app, warm_caches
+
+warm_caches()